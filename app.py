@@ -1,7 +1,77 @@
 # Importation des bibliothèques nécessaires
+import functools
+import os
+import random
+from typing import Tuple
 import streamlit as st  # Streamlit pour la création de l'application web interactive.
+import streamlit.components.v1 as components  # Composants personnalisés (utilisé pour la grille cliquable).
 from src.core import ColorSudoku  # Importation de la classe ColorSudoku, qui est responsable de la génération et de la gestion du Sudoku des couleurs.
 
+# Composant affichant toute la grille dans un seul tableau HTML et renvoyant la case vide cliquée.
+sudoku_grid = components.declare_component("sudoku_grid", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "grid"))
+
+
+@functools.lru_cache(maxsize=None)
+def cell_templates(size: int, width: int, height: int, palette: Tuple[str, ...]) -> Tuple[Tuple[Tuple[str, ...], ...], Tuple[str, ...]]:
+    """
+    Prépare une seule fois le code HTML de chaque case pour une taille de grille donnée : les cases vides
+    (qui portent leurs coordonnées "ligne-colonne" et leur info-bulle) et une case coloriée par couleur.
+    Le rendu de la grille ne fait ensuite plus aucun formatage de chaîne par case.
+    """
+    cell_style = f"width:{width}px; height:{height}px;"  # Définition du style CSS pour chaque cellule.
+    empty = tuple(
+        tuple(f'<td class="empty" data-cell="{r}-{c}" title="Choisir cette case ({r+1},{c+1})" style="{cell_style}"></td>' for c in range(size))
+        for r in range(size)
+    )
+    filled = tuple(f'<td style="{cell_style} background-color:{color};"></td>' for color in palette)
+    return empty, filled
+
+
+def render_grid_html(game: ColorSudoku, width: int, height: int) -> str:
+    """
+    Construit le tableau HTML de la grille en une seule chaîne : les cases vides portent leurs
+    coordonnées ("ligne-colonne") pour que le composant puisse renvoyer la case cliquée.
+    """
+    empty, filled = cell_templates(game.size, width, height, game.palette)
+    html = ["<table class='sudoku'>"]
+    for r, row in enumerate(game.state.tolist()):  # Parcourt toutes les lignes de la grille.
+        html.append("<tr>")
+        # Indice de couleur de la case (ou 0 si elle est vide).
+        html.extend(filled[color - 1] if color else empty[r][c] for c, color in enumerate(row))
+        html.append("</tr>")
+    html.append("</table>")
+    return "".join(html)
+
+
+@st.fragment
+def color_picker(game: ColorSudoku):
+    """
+    Sélecteur de couleur. Fragment indépendant : changer de couleur ne relance que ce bloc ;
+    la grille lit la couleur choisie dans `st.session_state.color_selector`.
+    """
+    # Permet à l'utilisateur de choisir une couleur parmi les couleurs disponibles (la valeur retournée est l'indice 1..size de la couleur).
+    st.radio("Couleur sélectionnée", range(1, game.size + 1), format_func=lambda i: game.palette[i - 1], index=0, key="color_selector")
+
+
+@st.fragment
+def render_grid(game: ColorSudoku, width: int, height: int):
+    """
+    Affiche la grille et applique les clics de l'utilisateur. Fragment : un clic ne relance que ce bloc,
+    pas toute la page.
+    """
+    # La valeur du composant (dernier clic) est déjà disponible dans session_state avant son affichage :
+    # le clic est appliqué d'abord, si bien que la grille affichée est à jour sans relance supplémentaire.
+    # Le composant renvoie le dernier clic à chaque exécution : on ne traite chaque clic qu'une seule fois.
+    click = st.session_state.get("grid")
+    if click is not None and click["nonce"] != st.session_state.get("last_click"):
+        st.session_state.last_click = click["nonce"]
+        r, c = map(int, click["cell"].split("-"))
+        game.set_user_color(r, c, st.session_state.color_selector)  # Applique la couleur sélectionnée à la case.
+
+    # Un seul élément pour toute la grille (au lieu d'un widget par case).
+    sudoku_grid(html=render_grid_html(game, width, height), key="grid", default=None)
+
+
 # Fonction principale qui est exécutée lors de l'appel de l'application Streamlit.
 def main():
     st.title("Sudoku des Couleurs")  # Affichage du titre de l'application.
@@ -18,8 +88,12 @@ def main():
         height, width = 40, 130
 
     # Vérification si la session contient déjà un jeu. Si ce n'est pas le cas ou si la taille a changé, on crée un nouveau jeu.
+    # Graine de génération : les grilles sont mises en cache par (taille, algorithme, graine), une graine inchangée réutilise donc la grille déjà générée.
+    if "seed" not in st.session_state:
+        st.session_state.seed = random.randrange(2 ** 31)
+
     if "game" not in st.session_state or st.session_state.game.size != size:
-        st.session_state.game = ColorSudoku(size=size)  # Création d'un nouveau jeu de Sudoku des couleurs avec la taille définie.
+        st.session_state.game = ColorSudoku(size=size, seed=st.session_state.seed)  # Création d'un nouveau jeu de Sudoku des couleurs avec la taille définie.
 
     game = st.session_state.game  # On récupère l'objet 'game' de la session.
 
@@ -28,7 +102,8 @@ def main():
 
     # Bouton pour générer un nouveau puzzle.
     if st.button("Generate New Puzzle"):
-        st.session_state.game = ColorSudoku(size=size, algorithm=algorithm)  # Génération d'un nouveau Sudoku avec l'algorithme choisi.
+        st.session_state.seed += 1  # Nouvelle graine pour obtenir un nouveau puzzle.
+        st.session_state.game = ColorSudoku(size=size, algorithm=algorithm, seed=st.session_state.seed)  # Génération d'un nouveau Sudoku avec l'algorithme choisi.
         st.rerun()  # Redémarre l'application pour recharger le puzzle généré.
 
     # Instructions pour l'utilisateur pour sélectionner une couleur et remplir la grille.
@@ -38,27 +113,11 @@ def main():
 
     # Colonne pour choisir une couleur.
     with col2:
-        selected_color = st.radio("Couleur sélectionnée", game.colors, index=0, key="color_selector")  # Permet à l'utilisateur de choisir une couleur parmi les couleurs disponibles.
+        color_picker(game)
 
     # Colonne principale pour afficher la grille et permettre à l'utilisateur de colorier les cases.
     with col1:
-        for r in range(game.size):  # Parcourt toutes les lignes de la grille.
-            cols = st.columns(game.size)  # Crée des colonnes dans Streamlit pour chaque cellule de la ligne.
-            for c in range(game.size):  # Parcourt chaque cellule de la ligne.
-                color = game.grid[r][c]  # Récupère la couleur de la case (ou None si elle est vide).
-                cell_style = f"width:{width}px; height:{height}px;"  # Définition du style CSS pour chaque cellule.
-
-                if color is None:  # Si la case est vide (pas encore coloriée).
-                    # Crée un bouton pour colorier la case (lorsque l'utilisateur clique dessus).
-                    if cols[c].button(" ", key=f"{r}-{c}", help=f"Choisir cette case ({r+1},{c+1})", use_container_width=True):
-                        game.set_user_color(r, c, selected_color)  # Applique la couleur sélectionnée à la case.
-                        st.rerun()  # Redémarre l'application pour mettre à jour la grille après chaque action.
-                else:  # Si la case est déjà coloriée.
-                    # Affiche la couleur de la case.
-                    cols[c].markdown(
-                        f'<div style="border-radius:5px; display:flex; align-items:center; justify-content:center; border:1px solid #999; {cell_style} background-color:{color};"></div>',
-                        unsafe_allow_html=True  # Utilise HTML et CSS pour afficher la cellule coloriée.
-                    )
+        render_grid(game, width, height)
 
     # Séparateur visuel entre la grille et les boutons d'action.
     st.markdown("---")
@@ -77,7 +136,8 @@ def main():
             st.rerun()  # Redémarre l'application pour afficher la grille avec la solution.
     with col5:
         if st.button("Recommencer"):  # Bouton pour recommencer une nouvelle partie.
-            st.session_state.game = ColorSudoku(size=size, algorithm=algorithm)  # Crée un nouveau jeu de Sudoku des couleurs avec la même taille et le même algorithme.
+            st.session_state.seed += 1  # Nouvelle graine pour obtenir un nouveau puzzle.
+            st.session_state.game = ColorSudoku(size=size, algorithm=algorithm, seed=st.session_state.seed)  # Crée un nouveau jeu de Sudoku des couleurs avec la même taille et le même algorithme.
             st.rerun()  # Redémarre l'application pour recommencer le jeu.
 
 # Appelle la fonction main si ce script est exécuté en tant qu'application Streamlit.
@@ -0,0 +1,20 @@
+try:
+    from numba import njit
+except ImportError:  # numba est optionnel : sans lui, les noyaux sont exécutés par l'interpréteur Python.
+    njit = None
+
+HAVE_NUMBA = njit is not None
+
+
+def compile_kernel(func):
+    """
+    Retourne la version compilée (et mise en cache sur disque) du noyau si numba est disponible,
+    sinon la fonction Python telle quelle.
+
+    Args :
+        func : Fonction du noyau, écrite uniquement avec des entiers et des tableaux NumPy.
+
+    Retourne :
+        La fonction à appeler.
+    """
+    return njit(cache=True)(func) if HAVE_NUMBA else func
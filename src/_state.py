@@ -0,0 +1,109 @@
+import functools
+from typing import List, Tuple
+
+EMPTY = 255  # Valeur d'une case vide dans la grille (les indices de couleurs tiennent sur un octet)
+
+
+@functools.lru_cache(maxsize=None)
+def build_peers(size: int, box_size: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Calcule une seule fois par taille les voisins (ligne, colonne et bloc, sans la case elle-même) de chaque case.
+
+    Args :
+        size (int) : Taille de la grille.
+        box_size (int) : Taille d'un bloc.
+
+    Retourne :
+        Tuple[Tuple[int, ...], ...] : Pour chaque case (indice row * size + col), les indices de ses voisins.
+    """
+    peers = []
+    for row in range(size):
+        for col in range(size):
+            box_row, box_col = (row // box_size) * box_size, (col // box_size) * box_size
+            neighbors = {row * size + i for i in range(size)} | {i * size + col for i in range(size)}
+            neighbors |= {(box_row + i) * size + box_col + j for i in range(box_size) for j in range(box_size)}
+            neighbors.discard(row * size + col)  # Supprime la cellule elle-même des voisins
+            peers.append(tuple(sorted(neighbors)))
+    return tuple(peers)
+
+
+class CandidateState:
+    """
+    État de la recherche MRV : la grille et, pour chaque case, le masque de bits des couleurs
+    encore possibles (bit i levé si la couleur d'indice i peut y être placée).
+
+    Chaque affectation retire la couleur des candidats de tous les voisins ; une case qui n'a plus
+    qu'un seul candidat reçoit aussitôt cette couleur (propagation des singletons, à la Norvig).
+
+    Attributs :
+        size (int) : Taille de la grille.
+        peers (Tuple[Tuple[int, ...], ...]) : Voisins de chaque case (voir `build_peers`).
+        grid (bytearray) : Indice de la couleur de chaque case (EMPTY pour une case vide), indexé par row * size + col.
+        cand (List[int]) : Masque des couleurs possibles pour chaque case.
+        count (bytearray) : Nombre de couleurs possibles de chaque case (nombre de bits de cand), tenu à jour.
+    """
+
+    def __init__(self, size: int, box_size: int, num_colors: int) -> None:
+        """
+        Initialise un état vide : toutes les couleurs sont possibles dans toutes les cases.
+
+        Args :
+            size (int) : Taille de la grille.
+            box_size (int) : Taille d'un bloc.
+            num_colors (int) : Nombre de couleurs disponibles.
+        """
+        self.size = size
+        self.peers = build_peers(size, box_size)
+        self.grid = bytearray([EMPTY]) * (size * size)
+        self.cand: List[int] = [(1 << num_colors) - 1] * (size * size)
+        self.count = bytearray([num_colors]) * (size * size)
+
+    def copy(self) -> "CandidateState":
+        """
+        Retourne une copie de l'état (les listes sont copiées, la table des voisins est partagée).
+        Le retour sur trace se fait en repartant de la copie faite avant l'affectation.
+        """
+        state = CandidateState.__new__(CandidateState)
+        state.size, state.peers = self.size, self.peers
+        state.grid, state.cand, state.count = self.grid[:], self.cand[:], self.count[:]
+        return state
+
+    def assign(self, cell: int, color: int) -> bool:
+        """
+        Place la couleur `color` dans la case `cell` et propage : la couleur est retirée des candidats
+        des voisins, et les voisins réduits à un seul candidat sont affectés à leur tour.
+
+        Args :
+            cell (int) : Indice de la case (row * size + col).
+            color (int) : Indice de la couleur à placer.
+
+        Retourne :
+            bool : False si la propagation aboutit à une contradiction (l'état est alors inutilisable), sinon True.
+        """
+        grid, cand, count, peers = self.grid, self.cand, self.count, self.peers
+        pending = [(cell, color)]  # Affectations à effectuer (pile explicite, pas de récursion)
+        while pending:
+            cell, color = pending.pop()
+            if grid[cell] != EMPTY:  # Case déjà affectée par la propagation
+                if grid[cell] != color:
+                    return False
+                continue
+            bit = 1 << color
+            if not cand[cell] & bit:
+                return False
+            grid[cell] = color
+            cand[cell] = bit
+            count[cell] = 1
+            for peer in peers[cell]:
+                remaining = cand[peer]
+                if remaining & bit:
+                    if grid[peer] != EMPTY:  # Un voisin porte déjà cette couleur
+                        return False
+                    remaining ^= bit
+                    cand[peer] = remaining
+                    count[peer] -= 1
+                    if not remaining:  # Plus aucune couleur possible pour ce voisin
+                        return False
+                    if count[peer] == 1:  # Un seul candidat : la couleur est forcée
+                        pending.append((peer, remaining.bit_length() - 1))
+        return True
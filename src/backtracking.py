@@ -1,6 +1,10 @@
 import random
+from math import isqrt
 from typing import List, Optional
+import numpy as np
 from .interface import ISudoku
+from ._numba import HAVE_NUMBA
+from .backtracking_kernel import solve_masked
 
 class BacktrackingGenerator(ISudoku):
     """
@@ -12,6 +16,9 @@ class BacktrackingGenerator(ISudoku):
     Attributs :
         size (int) : Taille de la grille (par défaut 9x9).
         colors (List[str]) : Liste des couleurs utilisées pour remplir la grille.
+        box_size (int) : Taille d'un bloc (racine carrée de size).
+        box_of (np.ndarray) : Indice du bloc de chaque case, à plat (case k = ligne * size + colonne).
+                              Sans numba, c'est une liste.
     """
 
     def __init__(self, size: int = 9, colors: Optional[List[str]] = None) -> None:
@@ -27,76 +34,44 @@ class BacktrackingGenerator(ISudoku):
         self.colors = colors if colors else [
             "red", "blue", "green", "yellow", "orange", "purple", "pink", "brown", "cyan"
         ]
+        self.box_size = isqrt(size)  # Taille du bloc
+        # Indice du bloc de chaque case, calculé une seule fois : (ligne // box_size) * box_size + colonne // box_size
+        band = np.arange(size) // self.box_size
+        self.box_of = (band[:, None] * self.box_size + band[None, :]).ravel()
+        if not HAVE_NUMBA:  # Interprété, le noyau est plus rapide sur des listes
+            self.box_of = self.box_of.tolist()
 
     def generate_sudoku(self) -> List[List[Optional[str]]]:
         """
         Génère une grille de Sudoku en utilisant un algorithme de backtracking.
 
+        La grille de travail est un tableau d'indices de couleurs et l'occupation de chaque
+        ligne, colonne et bloc est suivie par un masque de bits : tester une couleur revient à
+        tester un bit au lieu de parcourir la ligne, la colonne et le bloc. La résolution est
+        déléguée au noyau `solve_masked`, compilé avec numba lorsqu'il est installé.
+
         Retourne :
             List[List[Optional[str]]] : Une grille de Sudoku où chaque case contient une couleur 
                                         ou None si elle est vide.
         """
-        # Initialisation d'une grille vide (remplie de None)
-        grid: List[List[Optional[str]]] = [[None for _ in range(self.size)] for _ in range(self.size)]
-
-        def is_valid(row: int, col: int, color: str, grid: List[List[Optional[str]]]) -> bool:
-            """
-            Vérifie si une couleur peut être placée à la position (row, col) en respectant les règles du Sudoku.
-
-            Args :
-                row (int) : Indice de la ligne.
-                col (int) : Indice de la colonne.
-                color (str) : Couleur à placer.
-                grid (List[List[Optional[str]]]) : Grille actuelle du Sudoku.
-
-            Retourne :
-                bool : True si la couleur peut être placée, sinon False.
-            """
-            # Vérification de la ligne et de la colonne
-            for i in range(self.size):
-                if grid[row][i] == color or grid[i][col] == color:
-                    return False
-
-            # Vérification du sous-groupe (bloc)
-            box_size = int(self.size ** 0.5)  # Taille du bloc
-            box_row, box_col = (row // box_size) * box_size, (col // box_size) * box_size
-            
-            for i in range(box_size):
-                for j in range(box_size):
-                    if grid[box_row + i][box_col + j] == color:
-                        return False
-            
-            return True
-
-        def solve(row: int = 0, col: int = 0) -> bool:
-            """
-            Remplit la grille en utilisant un algorithme de backtracking.
-
-            Args :
-                row (int) : Indice de la ligne actuelle.
-                col (int) : Indice de la colonne actuelle.
-
-            Retourne :
-                bool : True si la grille est remplie avec succès, sinon False.
-            """
-            if row == self.size:  # Si on a atteint la fin de la grille, le Sudoku est valide
-                return True
-
-            if col == self.size:  # Passer à la ligne suivante si on atteint la fin d'une ligne
-                return solve(row + 1, 0)
-
-            random.shuffle(self.colors)  # Mélanger les couleurs pour varier les solutions
-
-            for color in self.colors:
-                if is_valid(row, col, color, grid):  # Vérifier si la couleur est valide
-                    grid[row][col] = color  # Placer la couleur
-                    
-                    if solve(row, col + 1):  # Passer à la prochaine case
-                        return True
-                    
-                    grid[row][col] = None  # Annuler le placement en cas d'impasse (backtracking)
-
-            return False  # Aucune solution trouvée pour cette case
-
-        solve()  # Démarrer la résolution
-        return grid  # Retourner la grille remplie
+        size = self.size
+        # Initialisation d'une grille vide à plat (0 pour une case vide, sinon l'indice de la couleur + 1)
+        grid = [0] * (size * size)
+        row_mask = [0] * size  # Couleurs déjà utilisées dans chaque ligne
+        col_mask = [0] * size  # Couleurs déjà utilisées dans chaque colonne
+        box_mask = [0] * size  # Couleurs déjà utilisées dans chaque bloc
+
+        # Ordre aléatoire des couleurs pour chaque case, tiré une seule fois pour toute la résolution
+        # (la graine vient du module random pour que random.seed() rende la génération reproductible)
+        rng = np.random.default_rng(random.getrandbits(64))
+        orders = np.argsort(rng.random((size * size, size)), axis=1)
+        if HAVE_NUMBA:  # Le noyau compilé attend des tableaux NumPy
+            grid = np.array(grid, dtype=np.int8)
+            row_mask, col_mask, box_mask = (np.array(mask, dtype=np.int64) for mask in (row_mask, col_mask, box_mask))
+        else:
+            orders = orders.tolist()
+
+        solve_masked(grid, row_mask, col_mask, box_mask, orders, self.box_of, size)
+        # Retourner la grille remplie avec les couleurs
+        colors = [self.colors[color - 1] if color else None for color in grid]
+        return [colors[row * size:(row + 1) * size] for row in range(size)]
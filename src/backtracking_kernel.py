@@ -0,0 +1,66 @@
+import numpy as np
+from ._numba import compile_kernel
+
+
+def _solve_masked(grid: np.ndarray, row_mask: np.ndarray, col_mask: np.ndarray, box_mask: np.ndarray,
+                  orders: np.ndarray, box_of: np.ndarray, size: int) -> bool:
+    """
+    Remplit la grille case par case avec un backtracking itératif sur des masques de bits.
+
+    Le noyau ne manipule que des entiers et des tableaux NumPy afin de pouvoir être compilé
+    par numba ; l'ordre dans lequel les couleurs sont essayées pour chaque case est fourni par
+    l'appelant (table de permutations tirée une seule fois), le noyau ne fait donc aucun tirage aléatoire.
+    Sans numba, l'appelant passe de simples listes : interprété, l'accès à une liste est plus rapide
+    que l'accès à un scalaire NumPy.
+
+    Args :
+        grid (np.ndarray) : Grille à plat (int8, size*size) ; 0 pour une case vide, sinon l'indice de la couleur + 1.
+        row_mask (np.ndarray) : Couleurs déjà utilisées dans chaque ligne (int64, un bit par couleur).
+        col_mask (np.ndarray) : Couleurs déjà utilisées dans chaque colonne.
+        box_mask (np.ndarray) : Couleurs déjà utilisées dans chaque bloc.
+        orders (np.ndarray) : Table (size*size x size) : la ligne k est la permutation des couleurs à essayer pour la case k.
+        box_of (np.ndarray) : Indice du bloc de chaque case (table plate de size*size entrées).
+        size (int) : Taille de la grille.
+
+    Retourne :
+        bool : True si la grille est remplie avec succès, sinon False.
+    """
+    cells = size * size
+    positions = [0] * cells  # Prochaine couleur à essayer dans l'ordre de chaque case
+    k = 0
+    while k >= 0 and k < cells:
+        row = k // size
+        col = k % size
+        box = box_of[k]
+        color = grid[k] - 1
+        if color >= 0:
+            # Retour sur trace : annuler le placement précédent de cette case
+            bit = 1 << color
+            row_mask[row] ^= bit
+            col_mask[col] ^= bit
+            box_mask[box] ^= bit
+            grid[k] = 0
+        else:
+            positions[k] = 0  # Nouvelle visite : repartir du début de l'ordre de la case
+
+        used = row_mask[row] | col_mask[col] | box_mask[box]
+        order = orders[k]
+        i = positions[k]
+        while i < size and (used >> order[i]) & 1 != 0:  # Ignorer les couleurs déjà utilisées
+            i += 1
+        if i == size:
+            k -= 1  # Aucune couleur possible : revenir à la case précédente
+            continue
+
+        color = order[i]
+        positions[k] = i + 1
+        bit = 1 << color
+        grid[k] = color + 1  # Placer la couleur
+        row_mask[row] |= bit
+        col_mask[col] |= bit
+        box_mask[box] |= bit
+        k += 1  # Passer à la prochaine case
+    return k == cells
+
+
+solve_masked = compile_kernel(_solve_masked)
@@ -1,10 +1,128 @@
 import random
-from typing import Optional, List
+from math import isqrt
+from typing import Optional, List, Tuple
+import numpy as np
+import streamlit as st
 from .backtracking import BacktrackingGenerator
 from .mrv import MRVGenerator
 from .dsatur import DSATURGenerator
 from .knuth import DLXSudokuGenerator
 
+# Palette des couleurs d'affichage : la couleur d'indice i (1..size) dans la grille est PALETTE[i - 1].
+# Elle ne sert qu'au rendu, les algorithmes ne manipulent que des indices.
+PALETTE = ("red", "blue", "green", "yellow", "orange", "purple", "pink", "brown", "cyan", "lime", "teal", "magenta", "gold", "silver", "navy", "maroon")
+
+# Classe du générateur associée à chaque algorithme.
+GENERATORS = {"Backtracking": BacktrackingGenerator, "MRV": MRVGenerator, "Dsatur": DSATURGenerator, "Knuth": DLXSudokuGenerator}
+
+
+@st.cache_resource
+def _canonical(size: int) -> np.ndarray:
+    """
+    Grille résolue de référence pour une taille donnée, calculée une seule fois avec l'algorithme de Knuth (DLX).
+    Le tableau est partagé entre toutes les sessions : il ne doit pas être modifié.
+
+    Args:
+        size (int): La taille du Sudoku.
+
+    Returns:
+        np.ndarray: La grille résolue (int8, indices de couleurs 1..size).
+    """
+    grid = np.array(DLXSudokuGenerator(size, list(range(1, size + 1))).generate_sudoku(), dtype=np.int8)
+    # Le générateur permute les couleurs au hasard : on les renumérote pour que la première ligne soit 1..size,
+    # la grille de référence (et donc la grille obtenue pour une graine) est ainsi la même d'un processus à l'autre.
+    relabel = np.zeros(size + 1, dtype=np.int8)
+    relabel[grid[0]] = np.arange(1, size + 1)
+    return relabel[grid]
+
+
+def _shuffle_solution(grid: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Produit une nouvelle grille valide à partir d'une grille résolue, par des transformations qui préservent
+    les règles du Sudoku : permutation des couleurs, des bandes (groupes de lignes de boîtes), des lignes dans
+    chaque bande, des piles (groupes de colonnes de boîtes) et des colonnes dans chaque pile.
+
+    Args:
+        grid (np.ndarray): Une grille résolue (indices de couleurs 1..size).
+        rng (np.random.Generator): Le générateur aléatoire à utiliser.
+
+    Returns:
+        np.ndarray: La nouvelle grille résolue.
+    """
+    size = grid.shape[0]
+    rank = isqrt(size)
+    within = np.tile(np.arange(rank), (rank, 1))
+    rows = (rng.permutation(rank)[:, None] * rank + rng.permuted(within, axis=1)).ravel()  # Bandes, puis lignes de chaque bande.
+    cols = (rng.permutation(rank)[:, None] * rank + rng.permuted(within, axis=1)).ravel()  # Piles, puis colonnes de chaque pile.
+    colors = np.concatenate(([0], rng.permutation(size) + 1)).astype(grid.dtype)  # Renommage des couleurs (0 reste 0).
+    return colors[grid[np.ix_(rows, cols)]]
+
+
+@st.cache_data(max_entries=32)
+def _generate(size: int, algorithm: str, seed: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Génère une grille complète avec l'algorithme choisi. La génération ne dépend que de
+    (size, algorithm, seed) : le résultat est mis en cache par Streamlit, si bien qu'un
+    puzzle déjà généré (ex. retour à un rang précédent) est réutilisé sans relancer l'algorithme.
+
+    Args:
+        size (int): La taille du Sudoku.
+        algorithm (str): L'algorithme de génération ("Backtracking", "MRV", "Dsatur", "Knuth").
+        seed (int): La graine du générateur aléatoire.
+
+    Returns:
+        Tuple[Tuple[int, ...], ...]: La grille sous forme d'indices de couleurs (1..size, 0 pour une case vide).
+    """
+    if algorithm == "Knuth":
+        # DLX est déterministe : la grille de référence est calculée une seule fois par taille,
+        # puis transformée aléatoirement pour obtenir une nouvelle grille.
+        shuffled = _shuffle_solution(_canonical(size), np.random.default_rng(seed))
+        return tuple(tuple(row) for row in shuffled.tolist())
+
+    # Sélectionne l'algorithme de génération de Sudoku approprié ; les "couleurs" sont directement les indices 1..size.
+    try:
+        generator = GENERATORS[algorithm](size, list(range(1, size + 1)))
+    except KeyError:
+        raise ValueError("Unknown algorithm selected!") from None  # Lève une erreur si un algorithme inconnu est fourni.
+
+    rng_state = random.getstate()  # Isole la graine : l'état global du module random est restauré ensuite.
+    random.seed(seed)
+    try:
+        grid = generator.generate_sudoku()
+    finally:
+        random.setstate(rng_state)
+
+    if grid is None:  # Le générateur a échoué (ex. DSATUR sans retour arrière) : grille vide.
+        return tuple((0,) * size for _ in range(size))
+    return tuple(tuple(color or 0 for color in row) for row in grid)  # None (case non coloriée) devient 0.
+
+
+def is_valid_grid(grid: np.ndarray) -> bool:
+    """
+    Vérifie qu'une grille d'indices de couleurs (0 pour une case vide) est une solution complète.
+    Une grille est valide si et seulement si chaque ligne, colonne et boîte est une permutation de 1..size,
+    ce que l'on vérifie en triant la grille selon chaque axe.
+
+    Args:
+        grid (np.ndarray): La grille à vérifier, de forme size x size.
+
+    Returns:
+        bool: True si la grille est une solution valide, sinon False.
+    """
+    # Chaque test renvoie False dès le premier échec, sans examiner les axes suivants :
+    # pendant une partie, la grille contient presque toujours une case vide.
+    if not grid.all():  # Une cellule vide : ce n'est pas une solution valide.
+        return False
+    size = grid.shape[0]
+    rank = isqrt(size)
+    expected = np.arange(1, size + 1)
+    if not (np.sort(grid, axis=1) == expected).all():  # Conflit dans une ligne.
+        return False
+    if not (np.sort(grid, axis=0) == expected[:, None]).all():  # Conflit dans une colonne.
+        return False
+    boxes = grid.reshape(rank, rank, rank, rank).transpose(0, 2, 1, 3).reshape(size, size)  # Une boîte par ligne.
+    return bool((np.sort(boxes, axis=1) == expected).all())  # Conflit dans une boîte.
+
 
 class ColorSudoku:
     """
@@ -14,23 +132,25 @@ class ColorSudoku:
     Attributes:
         size (int): La taille du Sudoku (ex : 9 pour un Sudoku classique 9x9).
         rank (int): Le rang de la grille (calculé comme la racine carrée de la taille).
-        colors (List[str]): Liste des couleurs utilisées dans le Sudoku.
+        palette (Tuple[str, ...]): Couleurs d'affichage du Sudoku (la couleur d'indice i est codée i + 1 dans la grille).
         algorithm (str): L'algorithme utilisé pour générer la grille de Sudoku ("Backtracking", "MRV", "Dsatur", "Knuth").
-        grid (List[List[Optional[str]]]): La grille actuelle du Sudoku avec les couleurs.
-        solution (List[List[str]]): La solution complète du Sudoku (avant d'enlever des couleurs pour rendre le puzzle).
+        seed (int): La graine utilisée pour générer la grille.
+        state (np.ndarray): La grille actuelle du Sudoku (int8, 0 = case vide, 1..size = indice de couleur).
+        solution (np.ndarray): La solution complète du Sudoku (avant d'enlever des couleurs pour rendre le puzzle).
+        row_mask, col_mask, box_mask (List[int]): Masques de bits des couleurs présentes dans chaque
+            ligne, colonne et boîte ; le bit `1 << couleur` est levé si la couleur y est déjà placée.
     
     Methods:
-        __init__(self, size=9, algorithm="Backtracking", colors=None, test=False): Initialisation du générateur de Sudoku.
-        generate_colors(self) -> List[str]: Génère une liste de couleurs pour le Sudoku.
-        generate_sudoku(self) -> List[List[Optional[str]]]: Génère la grille du Sudoku selon l'algorithme sélectionné.
+        __init__(self, size=9, algorithm="Backtracking", colors=None, test=False, seed=None): Initialisation du générateur de Sudoku.
+        generate_sudoku(self) -> np.ndarray: Génère la grille du Sudoku selon l'algorithme sélectionné.
         remove_colors(self, remove_count: int): Retire un nombre spécifié de couleurs de la grille pour créer un puzzle.
         is_valid_solution(self) -> bool: Vérifie si la grille actuelle est une solution valide.
-        is_valid_placement(self, row: int, col: int, color: str) -> bool: Vérifie si une couleur peut être placée dans une cellule donnée.
-        set_user_color(self, row: int, col: int, color: str): Définit la couleur d'une cellule spécifiée par l'utilisateur.
+        is_valid_placement(self, row: int, col: int, color: int) -> bool: Vérifie si une couleur peut être placée dans une cellule donnée.
+        set_user_color(self, row: int, col: int, color: int): Définit la couleur d'une cellule spécifiée par l'utilisateur.
         reveal_solution(self): Révèle la solution complète du Sudoku.
     """
 
-    def __init__(self, size: int = 9, algorithm: str = "Backtracking", colors: Optional[List[str]] = None, test: bool = False):
+    def __init__(self, size: int = 9, algorithm: str = "Backtracking", colors: Optional[List[str]] = None, test: bool = False, seed: Optional[int] = None):
         """
         Initialise un générateur de Sudoku coloré avec la taille spécifiée, l'algorithme de génération choisi,
         et une liste optionnelle de couleurs. Si `test` est False, des couleurs seront retirées pour créer un puzzle.
@@ -40,48 +160,61 @@ class ColorSudoku:
             algorithm (str): L'algorithme de génération du Sudoku (par défaut "Backtracking").
             colors (List[str], optionnel): Liste des couleurs à utiliser. Si None, une liste par défaut est générée.
             test (bool): Si True, ne supprime pas les couleurs de la grille (utilisé pour les tests).
+            seed (int, optionnel): Graine de génération. Si None, une graine aléatoire est tirée.
         """
         self.size = size
-        self.rank = int(size ** 0.5)  # Rang de la grille, c'est la racine carrée de la taille.
-        self.colors = self.generate_colors()  # Génère les couleurs à utiliser pour le Sudoku.
+        self.rank = isqrt(size)  # Rang de la grille, c'est la racine carrée de la taille.
         self.algorithm = algorithm  # Algorithme de génération de Sudoku sélectionné.
-        self.grid = self.generate_sudoku()  # Génère la grille du Sudoku.
-        self.solution = [row[:] for row in self.grid]  # Crée une copie de la grille générée pour la solution complète.
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)  # Graine de génération de la grille.
+        self.state = self.generate_sudoku()  # Génère la grille du Sudoku.
+        self.solution = self.state.copy()  # Crée une copie de la grille générée pour la solution complète.
+        # Masques des couleurs présentes dans chaque ligne, colonne et boîte (entiers Python : un accès
+        # dans une liste est bien moins coûteux qu'un accès scalaire dans un tableau NumPy).
+        self.row_mask: List[int] = []
+        self.col_mask: List[int] = []
+        self.box_mask: List[int] = []
+        self.update_masks()  # Masques de la grille complète ; remove_colors les tient ensuite à jour.
         if not test: 
             remove_count = int(.60 * size ** 2)  # Retirer 60% des cellules pour créer un puzzle.
             self.remove_colors(remove_count)
 
-    def generate_colors(self) -> List[str]:
+    @property
+    def palette(self) -> Tuple[str, ...]:
         """
-        Génère une liste de couleurs basée sur la taille du Sudoku (rank). Par défaut, elle utilise une liste
-        pré-définie de couleurs et limite la taille de cette liste en fonction du rang (ex. 3x3 ou 4x4).
+        Couleurs d'affichage du Sudoku : les `size` premières couleurs de PALETTE (ex. 9 couleurs pour un Sudoku 9x9).
+        Utilisées uniquement pour le rendu, la grille ne contient que des indices.
         
         Returns:
-            List[str]: Liste de couleurs.
+            Tuple[str, ...]: Couleurs d'affichage.
         """
-        base_colors = ["red", "blue", "green", "yellow", "orange", "purple", "pink", "brown", "cyan", "lime", "teal", "magenta", "gold", "silver", "navy", "maroon"]
-        return base_colors[:self.rank ** 2]  # Limite les couleurs à la taille de la grille (par exemple, 9 couleurs pour un Sudoku 9x9).
+        return PALETTE[:self.size]
 
-    def generate_sudoku(self) -> List[List[Optional[str]]]:
+    def generate_sudoku(self) -> np.ndarray:
         """
         Génère la grille de Sudoku en fonction de l'algorithme choisi pour la génération (Backtracking, MRV, DSATUR, Knuth).
+        La grille est obtenue via le cache de `_generate` pour le triplet (taille, algorithme, graine).
         
         Returns:
-            List[List[Optional[str]]]: La grille de Sudoku générée avec les couleurs.
-        """
-        # Sélectionne et utilise l'algorithme de génération de Sudoku approprié
-        if self.algorithm == "Backtracking":
-            generator = BacktrackingGenerator(self.size, self.colors)
-        elif self.algorithm == "MRV":
-            generator = MRVGenerator(self.size, self.colors)
-        elif self.algorithm == "Dsatur":
-            generator = DSATURGenerator(self.size, self.colors)
-        elif self.algorithm == "Knuth":
-            generator = DLXSudokuGenerator(self.size, self.colors)
-        else:
-            raise ValueError("Unknown algorithm selected!")  # Lève une erreur si un algorithme inconnu est fourni.
-        
-        return generator.generate_sudoku()  # Génère et retourne la grille de Sudoku avec l'algorithme choisi.
+            np.ndarray: La grille de Sudoku générée (int8, de forme size x size).
+        """
+        return np.array(_generate(self.size, self.algorithm, self.seed), dtype=np.int8)
+
+    def update_masks(self):
+        """
+        Recalcule les masques de bits des lignes, colonnes et boîtes à partir de la grille actuelle.
+        """
+        rank = self.rank
+        bits = np.where(self.state > 0, np.left_shift(np.uint32(1), self.state.astype(np.uint32)), np.uint32(0))
+        boxes = bits.reshape(rank, rank, rank, rank).transpose(0, 2, 1, 3).reshape(self.size, self.size)
+        self.row_mask = np.bitwise_or.reduce(bits, axis=1).tolist()
+        self.col_mask = np.bitwise_or.reduce(bits, axis=0).tolist()
+        self.box_mask = np.bitwise_or.reduce(boxes, axis=1).tolist()
+
+    def box_of(self, row: int, col: int) -> int:
+        """
+        Retourne l'indice (0..size-1) de la boîte contenant la cellule (row, col).
+        """
+        return (row // self.rank) * self.rank + col // self.rank
 
     def remove_colors(self, remove_count: int):
         """
@@ -90,12 +223,22 @@ class ColorSudoku:
         Args:
             remove_count (int): Le nombre de cellules à retirer de la grille pour créer un puzzle.
         """
-        cells = [(r, c) for r in range(self.size) for c in range(self.size)]  # Crée une liste de toutes les cellules (r, c).
-        random.shuffle(cells)  # Mélange les cellules pour enlever les couleurs de manière aléatoire.
-        for _ in range(remove_count):
-            if cells:
-                r, c = cells.pop()  # Retire une cellule de la liste et l'enlève de la grille.
-                self.grid[r][c] = None  # Enlève la couleur de la cellule pour créer un puzzle.
+        cells = self.size * self.size
+        # Tire directement les indices des cellules à vider, sans remise (ni liste de cases, ni mélange complet).
+        idx = random.sample(range(cells), min(remove_count, cells))
+        flat = self.state.reshape(-1)  # Vue à plat de la grille (indice = ligne * size + colonne)
+        size, rank = self.size, self.rank
+        row_mask, col_mask, box_mask = self.row_mask, self.col_mask, self.box_mask
+        # Retire le bit de chaque couleur enlevée des masques (XOR : la couleur était présente).
+        for cell, color in zip(idx, flat[idx].tolist()):
+            if not color:  # Case déjà vide : aucun bit à retirer.
+                continue
+            row, col = divmod(cell, size)
+            bit = 1 << color
+            row_mask[row] ^= bit
+            col_mask[col] ^= bit
+            box_mask[(row // rank) * rank + col // rank] ^= bit
+        flat[idx] = 0  # Enlève la couleur des cellules tirées pour créer un puzzle.
 
     def is_valid_solution(self) -> bool:
         """
@@ -104,58 +247,43 @@ class ColorSudoku:
         Returns:
             bool: True si la grille est une solution valide, sinon False.
         """
-        for r in range(self.size):
-            for c in range(self.size):
-                color = self.grid[r][c]
-                if color is None:  # Si la cellule est vide, ce n'est pas une solution valide.
-                    return False
-                if not self.is_valid_placement(r, c, color):  # Vérifie si la couleur placée est valide.
-                    return False
-        return True  # Si toutes les cellules sont valides, la solution est valide.
+        return is_valid_grid(self.state)
 
-    def is_valid_placement(self, row: int, col: int, color: str) -> bool:
+    def is_valid_placement(self, row: int, col: int, color: int) -> bool:
         """
         Vérifie si une couleur peut être placée à une position donnée (ligne, colonne) dans la grille.
         
         Args:
             row (int): Indice de la ligne de la cellule.
             col (int): Indice de la colonne de la cellule.
-            color (str): La couleur à vérifier.
+            color (int): L'indice de la couleur à vérifier (1..size).
         
         Returns:
             bool: True si le placement est valide, sinon False.
         """
-        # Vérifie si la couleur est déjà présente dans la même ligne ou colonne
-        for i in range(self.size):
-            if i != col and self.grid[row][i] == color:
-                return False  # La couleur est déjà présente dans la ligne.
-            if i != row and self.grid[i][col] == color:
-                return False  # La couleur est déjà présente dans la colonne.
-
-        # Vérifie si la couleur est déjà présente dans la même boîte (sous-grille)
-        box_size = self.rank  # Le "rank" est la racine carrée de la taille de la grille (3 pour 9x9).
-        box_row, box_col = (row // box_size) * box_size, (col // box_size) * box_size
-        for i in range(box_size):
-            for j in range(box_size):
-                r, c = box_row + i, box_col + j
-                if (r, c) != (row, col) and self.grid[r][c] == color:
-                    return False  # La couleur est déjà présente dans la boîte.
-        return True  # Si aucun conflit, le placement est valide.
-
-    def set_user_color(self, row: int, col: int, color: str):
+        bit = 1 << int(color)
+        # La couleur ne doit apparaître ni dans la ligne, ni dans la colonne, ni dans la boîte.
+        return not ((self.row_mask[row] | self.col_mask[col] | self.box_mask[self.box_of(row, col)]) & bit)
+
+    def set_user_color(self, row: int, col: int, color: int):
         """
         Permet à l'utilisateur de définir une couleur dans une cellule spécifique, si la cellule est vide.
         
         Args:
             row (int): L'indice de la ligne de la cellule.
             col (int): L'indice de la colonne de la cellule.
-            color (str): La couleur à attribuer à la cellule.
+            color (int): L'indice de la couleur à attribuer à la cellule (1..size).
         """
-        if self.grid[row][col] is None:  # Si la cellule est vide
-            self.grid[row][col] = color  # Affecte la couleur à la cellule.
+        if self.state[row, col] == 0:  # Si la cellule est vide
+            self.state[row, col] = color  # Affecte la couleur à la cellule.
+            bit = 1 << int(color)
+            self.row_mask[row] |= bit
+            self.col_mask[col] |= bit
+            self.box_mask[self.box_of(row, col)] |= bit
 
     def reveal_solution(self):
         """
         Révèle la solution complète du Sudoku (annule les couleurs retirées pour le puzzle).
         """
-        self.grid = [row[:] for row in self.solution]  # Remplace la grille actuelle par la solution complète.
+        np.copyto(self.state, self.solution)  # Recopie la solution complète dans la grille actuelle (sans nouvelle allocation).
+        self.update_masks()
@@ -0,0 +1,56 @@
+import heapq
+import numpy as np
+from ._numba import compile_kernel
+
+
+def _dsatur_fill(grid: np.ndarray, forbidden: np.ndarray, saturation: np.ndarray, peers: np.ndarray,
+                 num_colors: int) -> bool:
+    """
+    Colorie la grille case par case avec la stratégie DSATUR : la case vide la plus saturée
+    (la première dans l'ordre des lignes en cas d'égalité) reçoit la plus petite couleur disponible.
+
+    Les cases vides sont rangées dans un tas de (-saturation, case) ; une entrée est périmée quand
+    la case est remplie ou que sa saturation a augmenté (une nouvelle entrée est alors ajoutée).
+
+    Les tableaux sont des tableaux NumPy quand le noyau est compilé, et de simples listes sinon :
+    interprété, l'accès à une liste est plus rapide que l'accès à un scalaire NumPy.
+
+    Args :
+        grid (np.ndarray) : Grille à plat (int64, size*size) ; -1 pour une case vide, sinon l'indice de la couleur.
+        forbidden (np.ndarray) : Couleurs interdites pour chaque case (int64, un bit par couleur).
+        saturation (np.ndarray) : Nombre de couleurs interdites de chaque case.
+        peers (np.ndarray) : Table (size*size x nombre de voisins) des voisins de chaque case.
+        num_colors (int) : Nombre de couleurs disponibles.
+
+    Retourne :
+        bool : True si la grille est entièrement coloriée, False si une case n'a plus aucune couleur disponible.
+    """
+    full_mask = (1 << num_colors) - 1  # Un bit par couleur disponible
+    heap = [(0, cell) for cell in range(len(grid))]  # Déjà ordonnée : c'est un tas valide
+    while heap:
+        neg_dsat, cell = heapq.heappop(heap)
+        if grid[cell] >= 0 or -neg_dsat != saturation[cell]:  # Ignore les entrées périmées
+            continue
+        available = ~forbidden[cell] & full_mask
+        if available == 0:
+            return False  # Échec si aucune couleur n'est disponible pour cette cellule
+        bit = available & -available  # Plus petite couleur disponible
+        color = 0
+        while (bit >> color) != 1:
+            color += 1
+        grid[cell] = color
+        # Interdire la couleur à tous les voisins de la case
+        for peer in peers[cell]:
+            if forbidden[peer] & bit == 0:  # Bit encore libre : la saturation augmente d'une couleur
+                forbidden[peer] |= bit
+                saturation[peer] += 1
+                if grid[peer] < 0:
+                    # Saturation maximale : aucune autre case ne peut passer avant celle-ci, et elle n'a plus
+                    # aucune couleur disponible. L'échec est certain, inutile de continuer.
+                    if saturation[peer] == num_colors:
+                        return False
+                    heapq.heappush(heap, (-saturation[peer], peer))
+    return True
+
+
+dsatur_fill = compile_kernel(_dsatur_fill)
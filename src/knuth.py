@@ -1,170 +1,147 @@
+import functools
 import random
-from typing import List, Optional
+from math import isqrt
+from typing import List, Optional, Tuple
+import numpy as np
 from .interface import ISudoku
-
-class DLXNode:
-    """
-    Représente un noeud dans la structure de données utilisée pour l'algorithme DLX (Dancing Links).
-
-    Attributs :
-        row (Optional[int]) : Numéro de la ligne associée à ce noeud.
-        col (Optional[int]) : Numéro de la colonne associée à ce noeud.
-        up (DLXNode) : Référence au noeud au-dessus dans la colonne.
-        down (DLXNode) : Référence au noeud en dessous dans la colonne.
-        left (DLXNode) : Référence au noeud à gauche dans la ligne.
-        right (DLXNode) : Référence au noeud à droite dans la ligne.
-        column (Optional[DLXNode]) : Référence à la colonne à laquelle ce noeud appartient.
-        size (int) : Taille de la colonne (nombre de noeuds dans cette colonne).
-    """
-    def __init__(self, row: Optional[int] = None, col: Optional[int] = None, 
-                 up: Optional['DLXNode'] = None, down: Optional['DLXNode'] = None,
-                 left: Optional['DLXNode'] = None, right: Optional['DLXNode'] = None,
-                 column: Optional['DLXNode'] = None):
-        self.row = row
-        self.col = col
-        self.up = up or self  # Si pas de noeud au-dessus, on se réfère à soi-même (circularité)
-        self.down = down or self  # Si pas de noeud en dessous, on se réfère à soi-même
-        self.left = left or self  # Idem pour le gauche
-        self.right = right or self  # Idem pour la droite
-        self.column = column  # La colonne à laquelle ce noeud appartient
-        self.size = 0  # Initialisation de la taille de la colonne
-
+from .knuth_kernel import search_exact_cover
 
 class DLX:
     """
     Implémentation de l'algorithme DLX (Dancing Links), utilisé pour résoudre des problèmes d'Exact Cover.
 
+    Les noeuds ne sont pas des objets : chaque noeud est un indice dans des tableaux NumPy (int32)
+    qui contiennent ses liens. L'indice 0 est l'entête, les indices 1..nombre de colonnes sont les
+    entêtes de colonnes, puis viennent les noeuds de la matrice, ligne par ligne.
+
     Attributs :
-        header (DLXNode) : Noeud représentant l'entête de la structure DLX.
-        nodes (List[DLXNode]) : Liste de tous les noeuds de la structure DLX.
+        up, down, left, right (np.ndarray) : Indice du noeud voisin au-dessus, en dessous, à gauche et à droite.
+        col (np.ndarray) : Indice de l'entête de colonne de chaque noeud.
+        size (np.ndarray) : Nombre de noeuds de chaque colonne (valeur utile pour les entêtes de colonnes).
+        row (np.ndarray) : Numéro de la ligne de la matrice associée à chaque noeud (-1 pour les entêtes).
+        num_columns (int) : Nombre de colonnes de la matrice.
         solution (List[int]) : Liste des solutions trouvées.
     """
-    def __init__(self, matrix: List[List[int]]):
+    def __init__(self, matrix: Tuple[np.ndarray, np.ndarray], num_columns: Optional[int] = None):
         """
-        Initialise la structure DLX à partir d'une matrice d'entrée.
+        Initialise la structure DLX à partir d'une matrice d'entrée creuse.
 
         Args :
-            matrix (List[List[int]]) : Matrice représentant les contraintes du problème.
+            matrix (Tuple[np.ndarray, np.ndarray]) : Matrice creuse (format CSR) représentant les contraintes du
+                                                     problème : `(row_ptr, col_idx)`, les colonnes non nulles de la
+                                                     ligne i sont `col_idx[row_ptr[i]:row_ptr[i + 1]]`.
+            num_columns (Optional[int]) : Nombre de colonnes de la matrice. Si None, il est déduit
+                                          de la plus grande colonne utilisée.
         """
-        self.header = DLXNode()  # Noeud d'entête
-        self.nodes = []  # Liste des noeuds de la matrice
         self.solution = []  # Liste pour stocker la solution
-        self.build_linked_matrix(matrix)  # Construction de la matrice liée
-
-    def build_linked_matrix(self, matrix: List[List[int]]) -> None:
-        """
-        Convertit la matrice d'entrée en une structure de noeuds reliés.
-
-        Args :
-            matrix (List[List[int]]) : Matrice représentant les contraintes du problème.
-        """
-        # Création des colonnes de la structure DLX
-        columns = [DLXNode(col=i) for i in range(len(matrix[0]))]
-        
-        # Relier les colonnes entre elles
-        self.header.right = columns[0]
-        columns[0].left = self.header
-        for i in range(1, len(columns)):
-            columns[i - 1].right = columns[i]
-            columns[i].left = columns[i - 1]
-        columns[-1].right = self.header
-        self.header.left = columns[-1]
-        
-        # Créer les noeuds correspondant aux éléments de la matrice
-        for row in range(len(matrix)):
-            first = None
-            for col in range(len(matrix[row])):
-                if matrix[row][col]:
-                    node = DLXNode(row=row, col=col, column=columns[col])
-                    columns[col].size += 1
-                    if first is None:
-                        first = node
-                    else:
-                        node.left = first.left
-                        node.right = first
-                        first.left.right = node
-                        first.left = node
-                    
-                    columns[col].up.down = node
-                    node.up = columns[col].up
-                    node.down = columns[col]
-                    columns[col].up = node
-                    self.nodes.append(node)
-
-    def cover(self, column: DLXNode) -> None:
-        """
-        Cache une colonne et ses noeuds associés (opération de couverture).
+        self.build_linked_matrix(matrix, num_columns)  # Construction de la matrice liée
 
-        Args :
-            column (DLXNode) : Colonne à couvrir.
-        """
-        column.right.left = column.left
-        column.left.right = column.right
-        node = column.down
-        while node != column:
-            right_node = node.right
-            while right_node != node:
-                right_node.down.up = right_node.up
-                right_node.up.down = right_node.down
-                right_node.column.size -= 1
-                right_node = right_node.right
-            node = node.down
-
-    def uncover(self, column: DLXNode) -> None:
+    def build_linked_matrix(self, matrix: Tuple[np.ndarray, np.ndarray], num_columns: Optional[int] = None) -> None:
         """
-        Découvre une colonne et ses noeuds associés (opération inverse de la couverture).
+        Convertit la matrice creuse d'entrée en tableaux de liens (construits en une fois avec NumPy).
 
         Args :
-            column (DLXNode) : Colonne à découvrir.
-        """
-        node = column.up
-        while node != column:
-            left_node = node.left
-            while left_node != node:
-                left_node.column.size += 1
-                left_node.down.up = left_node
-                left_node.up.down = left_node
-                left_node = left_node.left
-            node = node.up
-        column.right.left = column
-        column.left.right = column
+            matrix (Tuple[np.ndarray, np.ndarray]) : Matrice creuse au format CSR `(row_ptr, col_idx)`.
+            num_columns (Optional[int]) : Nombre de colonnes de la matrice (déduit des entrées si None).
+        """
+        row_ptr, cols = matrix
+        # Éléments non nuls, ligne par ligne (dans l'ordre où les colonnes de chaque ligne sont données)
+        rows = np.repeat(np.arange(len(row_ptr) - 1), np.diff(row_ptr))
+        if num_columns is None:
+            num_columns = int(cols.max()) + 1
+        self.num_columns = num_columns
+        first = num_columns + 1  # Indice du premier noeud de la matrice
+        total = first + len(rows)
+        nodes = np.arange(first, total, dtype=np.int32)
+        headers = np.arange(num_columns + 1, dtype=np.int32)
+
+        self.up = np.empty(total, dtype=np.int32)
+        self.down = np.empty(total, dtype=np.int32)
+        self.left = np.empty(total, dtype=np.int32)
+        self.right = np.empty(total, dtype=np.int32)
+        self.col = np.empty(total, dtype=np.int32)
+        self.size = np.zeros(total, dtype=np.int32)
+        self.row = np.full(total, -1, dtype=np.int32)
+
+        # Relier l'entête et les colonnes entre eux (liste circulaire)
+        self.right[:first] = np.roll(headers, -1)
+        self.left[:first] = np.roll(headers, 1)
+        self.up[:first] = headers
+        self.down[:first] = headers
+        self.col[:first] = headers
+        self.col[first:] = cols + 1
+        self.row[first:] = rows
+        self.size[1:first] = np.bincount(cols, minlength=num_columns)
+
+        # Relier les noeuds d'une même ligne : chacun pointe vers le suivant, le dernier vers le premier
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])  # Premier noeud de chaque ligne
+        ends = np.r_[starts[1:], len(rows)] - 1  # Dernier noeud de chaque ligne
+        right = nodes + 1
+        right[ends] = nodes[starts]
+        self.right[first:] = right
+        self.left[right] = nodes
+
+        # Relier les noeuds d'une même colonne (de haut en bas), en refermant la boucle sur l'entête
+        order = np.lexsort((rows, cols))  # Noeuds triés par colonne puis par ligne
+        chain = nodes[order]
+        chain_cols = cols[order] + 1
+        last = np.r_[chain_cols[1:] != chain_cols[:-1], True]  # Dernier noeud de chaque colonne
+        down = np.r_[chain[1:], 0].astype(np.int32)
+        down[last] = chain_cols[last]
+        self.down[chain] = down
+        self.up[down] = chain
+        # Les entêtes de colonne pointent vers le premier noeud de leur colonne
+        head = np.r_[True, chain_cols[1:] != chain_cols[:-1]]
+        self.down[chain_cols[head]] = chain[head]
+        self.up[chain[head]] = chain_cols[head]
 
     def search(self) -> bool:
         """
-        Recherche la solution en utilisant l'algorithme de backtracking DLX.
+        Recherche la solution en utilisant l'algorithme de backtracking DLX. La recherche est déléguée
+        au noyau `search_exact_cover`, compilé avec numba lorsqu'il est installé.
 
         Retourne :
             bool : True si une solution est trouvée, sinon False.
         """
-        # Si la structure est vide (toutes les colonnes sont couvertes), c'est une solution
-        if self.header.right == self.header:
-            return True
-        
-        # Sélectionne la colonne avec le moins de noeuds
-        column = self.header.right
-        self.cover(column)
-        node = column.down
-        
-        # Parcours les noeuds de la colonne
-        while node != column:
-            self.solution.append(node.row)
-            right_node = node.right
-            while right_node != node:
-                self.cover(right_node.column)
-                right_node = right_node.right
-            
-            if self.search():
-                return True
-            
-            self.solution.pop()
-            left_node = node.left
-            while left_node != node:
-                self.uncover(left_node.column)
-                left_node = left_node.left
-            node = node.down
-        
-        self.uncover(column)
-        return False
+        # Une solution choisit au plus une ligne par colonne
+        nodes = np.empty(self.num_columns, dtype=np.int32)
+        count = search_exact_cover(self.up, self.down, self.left, self.right, self.col, self.size, nodes)
+        if count < 0:
+            return False
+        self.solution = self.row[nodes[:count]].tolist()  # Lignes de la matrice associées aux noeuds choisis
+        return True
+
+
+@functools.lru_cache(maxsize=None)
+def _cover_csr(size: int, box_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Crée la matrice d'Exact Cover représentant les contraintes du Sudoku, au format CSR : la ligne
+    (case, couleur) d'indice (row * size + col) * size + num ne contient que 4 uns, seuls leurs
+    indices de colonnes sont stockés. La matrice est calculée d'un bloc avec NumPy et mise en cache :
+    les tableaux sont partagés, ils sont donc en lecture seule.
+
+    Args :
+        size (int) : Taille de la grille.
+        box_size (int) : Taille d'un bloc.
+
+    Retourne :
+        Tuple[np.ndarray, np.ndarray] : `(row_ptr, col_idx)`.
+    """
+    cells = size * size
+
+    # Indices (ligne, colonne, couleur) de chaque ligne de la matrice, dans l'ordre des lignes
+    row, col, num = (index.ravel() for index in np.mgrid[0:size, 0:size, 0:size])
+    box = (row // box_size) * box_size + col // box_size  # Calcul du bloc
+    col_idx = np.stack((
+        row * size + col,  # Contrainte sur la cellule
+        cells + row * size + num,  # Contrainte sur la ligne
+        2 * cells + col * size + num,  # Contrainte sur la colonne
+        3 * cells + box * size + num,  # Contrainte sur le bloc
+    ), axis=1).ravel().astype(np.int32)
+    row_ptr = np.arange(0, 4 * size ** 3 + 1, 4, dtype=np.int32)  # Exactement 4 uns par ligne
+    row_ptr.flags.writeable = False
+    col_idx.flags.writeable = False
+    return row_ptr, col_idx
 
 
 class DLXSudokuGenerator(ISudoku):
@@ -177,6 +154,9 @@ class DLXSudokuGenerator(ISudoku):
     Attributs :
         size (int) : Taille de la grille (par défaut 9x9).
         colors (List[str]) : Liste des couleurs utilisées pour remplir la grille.
+        box_size (int) : Taille d'un bloc (racine carrée de size).
+        permutation (List[int]) : Permutation des indices de couleurs, tirée une seule fois : la couleur
+                                  d'indice num dans la solution de DLX devient la couleur permutation[num].
     """
     def __init__(self, size: int = 9, colors: Optional[List[str]] = None) -> None:
         """
@@ -191,6 +171,10 @@ class DLXSudokuGenerator(ISudoku):
         self.colors = colors if colors else [
             "red", "blue", "green", "yellow", "orange", "purple", "pink", "brown", "cyan"
         ]
+        self.box_size = isqrt(size)  # Taille du bloc, calculée une seule fois
+        # DLX est déterministe : seules les couleurs sont tirées au hasard, la recherche reste identique
+        self.permutation = list(range(size))
+        random.shuffle(self.permutation)
     
     def generate_sudoku(self) -> List[List[Optional[str]]]:
         """
@@ -200,34 +184,20 @@ class DLXSudokuGenerator(ISudoku):
             List[List[Optional[str]]] : Une grille de Sudoku remplie avec des couleurs ou None.
         """
         matrix = self.create_exact_cover_matrix()  # Créer la matrice d'Exact Cover
-        dlx = DLX(matrix)  # Créer une instance de DLX avec la matrice
+        dlx = DLX(matrix, 4 * self.size * self.size)  # Créer une instance de DLX avec la matrice
         dlx.search()  # Résoudre le problème avec la méthode search de DLX
         return self.build_grid_from_solution(dlx.solution)  # Construire la grille à partir de la solution trouvée
 
-    def create_exact_cover_matrix(self) -> List[List[int]]:
+    def create_exact_cover_matrix(self) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Crée la matrice d'Exact Cover représentant les contraintes du Sudoku.
+        Retourne la matrice d'Exact Cover représentant les contraintes du Sudoku (voir `_cover_csr`).
+        Elle ne dépend que de la taille : elle est calculée une seule fois et partagée entre les générateurs.
 
         Retourne :
-            List[List[int]] : La matrice d'Exact Cover pour le Sudoku.
+            Tuple[np.ndarray, np.ndarray] : `(row_ptr, col_idx)` ; les colonnes de la ligne i sont
+                                            les contraintes cellule, ligne, colonne et bloc `col_idx[4 * i:4 * i + 4]`.
         """
-        size = self.size
-        num_constraints = 4 * size * size  # Nombre de contraintes : cellule, ligne, colonne et bloc
-        matrix = [[0] * num_constraints for _ in range(size * size * size)]  # Matrice vide
-        
-        box_size = int(size ** 0.5)  # Calcul dynamique de la taille du bloc
-        
-        # Remplir la matrice avec les contraintes
-        for row in range(size):
-            for col in range(size):
-                for num in range(size):
-                    index = (row * size + col) * size + num
-                    matrix[index][row * size + col] = 1  # Contrainte sur la cellule
-                    matrix[index][size * size + row * size + num] = 1  # Contrainte sur la ligne
-                    matrix[index][2 * size * size + col * size + num] = 1  # Contrainte sur la colonne
-                    box = (row // box_size) * box_size + (col // box_size)  # Calcul du bloc
-                    matrix[index][3 * size * size + box * size + num] = 1  # Contrainte sur le bloc
-        return matrix
+        return _cover_csr(self.size, self.box_size)
 
     def build_grid_from_solution(self, solution: List[int]) -> List[List[Optional[str]]]:
         """
@@ -239,10 +209,12 @@ class DLXSudokuGenerator(ISudoku):
         Retourne :
             List[List[Optional[str]]] : La grille de Sudoku remplie avec des couleurs.
         """
-        grid = [[None for _ in range(self.size)] for _ in range(self.size)]
+        size = self.size
+        # Grille à plat d'indices de couleurs (255 pour une case vide) : un seul tampon au lieu d'une liste par ligne
+        grid = bytearray(b"\xff") * (size * size)
         for entry in solution:
-            row = entry // (self.size * self.size)
-            col = (entry // self.size) % self.size
-            num = entry % self.size
-            grid[row][col] = self.colors[num]  # Remplir la grille avec les couleurs correspondantes
-        return grid
+            # entry = (row * size + col) * size + num : la case est entry // size, la couleur entry % size
+            grid[entry // size] = entry % size
+        # Remplir la grille avec les couleurs correspondantes (après permutation des indices)
+        colors = [self.colors[self.permutation[num]] if num != 255 else None for num in grid]
+        return [colors[row * size:(row + 1) * size] for row in range(size)]
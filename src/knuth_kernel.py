@@ -0,0 +1,117 @@
+import numpy as np
+from ._numba import compile_kernel
+
+
+def _cover_column(column: int, up: np.ndarray, down: np.ndarray, left: np.ndarray, right: np.ndarray,
+                  col: np.ndarray, size: np.ndarray) -> None:
+    """
+    Cache une colonne et les lignes qui la contiennent (opération de couverture).
+
+    Args :
+        column (int) : Indice de l'entête de la colonne à couvrir.
+        up, down, left, right (np.ndarray) : Liens de chaque noeud (int32).
+        col (np.ndarray) : Indice de l'entête de colonne de chaque noeud.
+        size (np.ndarray) : Nombre de noeuds de chaque colonne.
+    """
+    right[left[column]] = right[column]
+    left[right[column]] = left[column]
+    node = down[column]
+    while node != column:
+        right_node = right[node]
+        while right_node != node:
+            down[up[right_node]] = down[right_node]
+            up[down[right_node]] = up[right_node]
+            size[col[right_node]] -= 1
+            right_node = right[right_node]
+        node = down[node]
+
+
+def _uncover_column(column: int, up: np.ndarray, down: np.ndarray, left: np.ndarray, right: np.ndarray,
+                    col: np.ndarray, size: np.ndarray) -> None:
+    """
+    Découvre une colonne et les lignes qui la contiennent (opération inverse de la couverture).
+
+    Args :
+        column (int) : Indice de l'entête de la colonne à découvrir.
+        up, down, left, right (np.ndarray) : Liens de chaque noeud (int32).
+        col (np.ndarray) : Indice de l'entête de colonne de chaque noeud.
+        size (np.ndarray) : Nombre de noeuds de chaque colonne.
+    """
+    node = up[column]
+    while node != column:
+        left_node = left[node]
+        while left_node != node:
+            size[col[left_node]] += 1
+            down[up[left_node]] = left_node
+            up[down[left_node]] = left_node
+            left_node = left[left_node]
+        node = up[node]
+    right[left[column]] = column
+    left[right[column]] = column
+
+
+def _search_exact_cover(up: np.ndarray, down: np.ndarray, left: np.ndarray, right: np.ndarray,
+                        col: np.ndarray, size: np.ndarray, solution: np.ndarray) -> int:
+    """
+    Recherche une solution du problème d'Exact Cover (algorithme X de Knuth sur les Dancing Links),
+    avec une pile explicite au lieu de la récursion : `solution[k]` est le noeud choisi au niveau k.
+
+    Args :
+        up, down, left, right (np.ndarray) : Liens de chaque noeud (int32) ; l'indice 0 est l'entête.
+        col (np.ndarray) : Indice de l'entête de colonne de chaque noeud.
+        size (np.ndarray) : Nombre de noeuds de chaque colonne.
+        solution (np.ndarray) : Tampon (au moins un élément par colonne) recevant les noeuds choisis.
+
+    Retourne :
+        int : Nombre de lignes de la solution trouvée (rangées dans `solution`), ou -1 s'il n'y en a pas.
+    """
+    level = 0
+    while True:
+        # Si la structure est vide (toutes les colonnes sont couvertes), c'est une solution
+        if right[0] == 0:
+            return level
+
+        # Sélectionne la colonne qui a le moins de noeuds (heuristique S de Knuth) : moins de branches à essayer
+        column = right[0]
+        best_size = size[column]
+        candidate = right[column]
+        while candidate != 0 and best_size > 1:  # Une colonne de taille 0 ou 1 ne peut pas être battue
+            if size[candidate] < best_size:
+                column = candidate
+                best_size = size[candidate]
+            candidate = right[candidate]
+        # Une colonne vide ne peut être couverte par aucune ligne : échec immédiat, sans la couvrir
+        covered = best_size > 0
+        if covered:
+            cover_column(column, up, down, left, right, col, size)
+        node = down[column]
+
+        # Colonne épuisée : retour sur trace jusqu'à un niveau qui a encore une ligne à essayer
+        while node == column:
+            if covered:
+                uncover_column(column, up, down, left, right, col, size)
+            covered = True  # Les colonnes des niveaux précédents ont toutes été couvertes
+            if level == 0:
+                return -1
+            level -= 1
+            node = solution[level]
+            left_node = left[node]
+            while left_node != node:
+                uncover_column(col[left_node], up, down, left, right, col, size)
+                left_node = left[left_node]
+            column = col[node]
+            node = down[node]
+
+        # Choisit la ligne du noeud et couvre les autres colonnes de cette ligne
+        solution[level] = node
+        right_node = right[node]
+        while right_node != node:
+            cover_column(col[right_node], up, down, left, right, col, size)
+            right_node = right[right_node]
+        level += 1
+
+
+# La recherche appelle cover_column et uncover_column par leur nom : les trois sont compilées ensemble.
+cover_column = compile_kernel(_cover_column)
+uncover_column = compile_kernel(_uncover_column)
+search_exact_cover = compile_kernel(_search_exact_cover)
@@ -1,6 +1,8 @@
 import random
-from typing import List, Optional, Tuple
+from math import isqrt
+from typing import List, Optional
 from .interface import ISudoku
+from ._state import EMPTY, CandidateState
 
 class MRVGenerator(ISudoku):
     """
@@ -12,6 +14,7 @@ class MRVGenerator(ISudoku):
     Attributs :
         size (int) : Taille de la grille (par défaut 9x9).
         colors (List[str]) : Liste des couleurs utilisées pour remplir la grille.
+        box_size (int) : Taille d'un bloc (racine carrée de size).
     """
 
     def __init__(self, size: int = 9, colors: Optional[List[str]] = None) -> None:
@@ -27,6 +30,7 @@ class MRVGenerator(ISudoku):
         self.colors = colors if colors else [
             "red", "blue", "green", "yellow", "orange", "purple", "pink", "brown", "cyan"
         ]
+        self.box_size = isqrt(size)  # Taille du bloc, calculée une seule fois
 
     def generate_sudoku(self) -> List[List[Optional[str]]]:
         """
@@ -36,84 +40,68 @@ class MRVGenerator(ISudoku):
             List[List[Optional[str]]] : Une grille de Sudoku où chaque case contient une couleur 
                                         ou None si elle est vide. Si la génération échoue, retourne None.
         """
-        # Initialisation d'une grille vide (remplie de None)
-        grid: List[List[Optional[str]]] = [[None for _ in range(self.size)] for _ in range(self.size)]
+        size = self.size
+        num_colors = len(self.colors)
+        # Ordre aléatoire des couleurs, tiré une seule fois : il départage les couleurs de même coût LCV
+        tiebreak = list(range(num_colors))
+        random.shuffle(tiebreak)
 
-        def is_valid(row: int, col: int, color: str, grid: List[List[Optional[str]]]) -> bool:
-            """
-            Vérifie si une couleur peut être placée à la position (row, col) en respectant les règles du Sudoku.
-
-            Args :
-                row (int) : Indice de la ligne.
-                col (int) : Indice de la colonne.
-                color (str) : Couleur à placer.
-                grid (List[List[Optional[str]]]) : Grille actuelle du Sudoku.
-
-            Retourne :
-                bool : True si la couleur peut être placée, sinon False.
-            """
-            # Vérification de la ligne et de la colonne
-            for i in range(self.size):
-                if grid[row][i] == color or grid[i][col] == color:
-                    return False
-
-            # Vérification du sous-groupe (bloc)
-            box_size = int(self.size ** 0.5)  # Taille du bloc
-            box_row, box_col = (row // box_size) * box_size, (col // box_size) * box_size
-            
-            for i in range(box_size):
-                for j in range(box_size):
-                    if grid[box_row + i][box_col + j] == color:
-                        return False
-            
-            return True
-
-        def get_least_remaining_values_cell(grid: List[List[Optional[str]]]) -> Optional[Tuple[int, int]]:
+        def get_least_remaining_values_cell(state: CandidateState) -> int:
             """
             Trouve la cellule avec le moins de valeurs possibles disponibles (stratégie MRV).
 
             Args :
-                grid (List[List[Optional[str]]]) : Grille actuelle du Sudoku.
+                state (CandidateState) : État actuel de la grille (candidats de chaque case).
 
             Retourne :
-                Optional[Tuple[int, int]] : La cellule avec le moins de valeurs possibles (ligne, colonne).
-                                            Retourne None si toutes les cellules sont remplies.
+                int : Indice (row * size + col) de la cellule avec le moins de valeurs possibles.
+                      Retourne -1 si toutes les cellules sont remplies.
             """
-            min_values = float('inf')  # Initialiser le minimum des valeurs restantes
-            best_cell = None  # Cellule avec le moins de valeurs possibles
-            for row in range(self.size):
-                for col in range(self.size):
-                    if grid[row][col] is None:  # Si la cellule est vide
-                        valid_colors = [color for color in self.colors if is_valid(row, col, color, grid)]
-                        if len(valid_colors) < min_values:
-                            min_values = len(valid_colors)
-                            best_cell = (row, col)
+            min_values = num_colors + 1  # Initialiser le minimum des valeurs restantes
+            best_cell = -1  # Cellule avec le moins de valeurs possibles
+            count = state.count  # Nombre de valeurs possibles de chaque case, tenu à jour par la propagation
+            for cell, color in enumerate(state.grid):
+                if color == EMPTY:  # Si la cellule est vide
+                    remaining = count[cell]
+                    if remaining < min_values:
+                        min_values = remaining
+                        best_cell = cell
             return best_cell
 
-        def solve() -> bool:
+        def solve(state: CandidateState) -> Optional[CandidateState]:
             """
-            Remplit la grille en utilisant un algorithme de backtracking avec MRV.
+            Remplit la grille en utilisant un algorithme de backtracking avec MRV ; chaque affectation
+            est propagée aux voisins, les cases réduites à une seule couleur sont remplies d'office.
+
+            Args :
+                state (CandidateState) : État de départ (il n'est pas modifié).
 
             Retourne :
-                bool : True si la grille est remplie avec succès, sinon False.
+                Optional[CandidateState] : L'état complètement rempli, ou None si aucune solution n'existe.
             """
             # Trouve la cellule avec le moins de valeurs possibles (MRV)
-            cell = get_least_remaining_values_cell(grid)
-            if cell is None:  # Si toutes les cellules sont remplies
-                return True
-            
-            row, col = cell
-            random.shuffle(self.colors)  # Mélange les couleurs pour varier les solutions
-
-            # Essayer chaque couleur valide pour cette cellule
-            for color in self.colors:
-                if is_valid(row, col, color, grid):
-                    grid[row][col] = color  # Assigner la couleur
-                    if solve():  # Appel récursif pour la prochaine cellule
-                        return True
-                    grid[row][col] = None  # Backtracking si aucune solution n'a été trouvée
-
-            return False  # Si aucune couleur ne fonctionne, retour à l'état précédent
-
-        solve()  # Démarrer la résolution
-        return grid  # Retourne la grille remplie
+            cell = get_least_remaining_values_cell(state)
+            if cell < 0:  # Si toutes les cellules sont remplies
+                return state
+
+            # Valeur la moins contraignante (LCV) d'abord : la couleur qui retire le moins de candidats
+            # aux voisins vides est essayée en premier, les égalités suivent l'ordre aléatoire tiré au départ.
+            candidates = state.cand[cell]
+            neighbors = [state.cand[peer] for peer in state.peers[cell] if state.grid[peer] == EMPTY]
+            order = sorted((color for color in tiebreak if candidates >> color & 1),
+                           key=lambda color: sum(mask >> color & 1 for mask in neighbors))
+
+            # Essayer chaque couleur encore possible pour cette cellule
+            for color in order:
+                child = state.copy()  # Le retour sur trace repart de l'état avant l'affectation
+                if child.assign(cell, color) and (solved := solve(child)) is not None:  # Appel récursif
+                    return solved
+
+            return None  # Si aucune couleur ne fonctionne, retour à l'état précédent
+
+        # Démarrer la résolution
+        solved = solve(CandidateState(size, self.box_size, num_colors))
+        if solved is None:
+            return [[None for _ in range(size)] for _ in range(size)]
+        # Traduit les indices de couleurs en couleurs
+        return [[self.colors[color] for color in solved.grid[row * size:(row + 1) * size]] for row in range(size)]
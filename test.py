@@ -1,9 +1,12 @@
 import unittest
-from typing import List
+from math import isqrt
+import numpy as np
+from typing import Dict, List, Tuple
 from src.backtracking import BacktrackingGenerator
 from src.mrv import MRVGenerator
 from src.dsatur import DSATURGenerator
-from src.knuth import DLXSudokuGenerator
+from src.knuth import DLX, DLXSudokuGenerator
+from src.core import ColorSudoku, is_valid_grid
 
 class TestColorSudoku(unittest.TestCase):
     """
@@ -35,35 +38,35 @@ class TestColorSudoku(unittest.TestCase):
         Retourne :
             bool : True si la grille est valide, False sinon.
         """
-        # Vérification des conflits dans les lignes et les colonnes
-        for r in range(size):
-            row_colors = set()
-            col_colors = set()
-            for c in range(size):
-                # Vérification des conflits dans la ligne
-                if grid[r][c] is not None:
-                    if grid[r][c] in row_colors:
-                        return False
-                    row_colors.add(grid[r][c])
-                # Vérification des conflits dans la colonne
-                if grid[c][r] is not None:
-                    if grid[c][r] in col_colors:
-                        return False
-                    col_colors.add(grid[c][r])
-
-        # Vérification des conflits dans les sous-grilles (boîtes)
-        box_size = int(size ** 0.5)  # Taille de chaque boîte (par exemple 3x3 pour un Sudoku 9x9)
-        for box_r in range(0, size, box_size):
-            for box_c in range(0, size, box_size):
-                box_colors = set()
-                for i in range(box_size):
-                    for j in range(box_size):
-                        r, c = box_r + i, box_c + j
-                        if grid[r][c] is not None:
-                            if grid[r][c] in box_colors:
-                                return False
-                            box_colors.add(grid[r][c])
-        return True
+        # Code entier de chaque couleur (-1 pour une case vide) : les comparaisons se font sur des entiers
+        codes = {color: i for i, color in enumerate({cell for row in grid for cell in row if cell is not None})}
+        arr = np.array([[codes[cell] if cell is not None else -1 for cell in row] for row in grid])
+
+        # Une ligne par unité : les lignes, les colonnes et les sous-grilles (boîtes) remises à plat
+        box_size = isqrt(size)  # Taille de chaque boîte (par exemple 3x3 pour un Sudoku 9x9)
+        boxes = arr.reshape(box_size, box_size, box_size, box_size).swapaxes(1, 2).reshape(size, size)
+        units = np.sort(np.vstack([arr, arr.T, boxes]), axis=1)
+
+        # Après le tri, un conflit est deux couleurs identiques côte à côte (les cases vides sont ignorées)
+        return not np.any((units[:, 1:] == units[:, :-1]) & (units[:, 1:] >= 0))
+
+    def exact_cover_with_givens(self, size, givens: Dict[Tuple[int, int], int]):
+        """
+        Construit la matrice d'Exact Cover d'une grille dont certaines cases sont déjà coloriées :
+        seules les lignes (case, couleur) compatibles avec ces cases sont gardées.
+
+        Args :
+            size (int) : Taille de la grille.
+            givens (Dict[Tuple[int, int], int]) : Indice de couleur (0..size-1) de chaque case donnée.
+
+        Retourne :
+            Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]] : Numéros (dans la matrice complète) des lignes
+                                                               gardées, et la matrice réduite au format CSR.
+        """
+        _, col_idx = DLXSudokuGenerator(size).create_exact_cover_matrix()
+        # La ligne i correspond à la case i // size et à la couleur i % size
+        keep = np.array([i for i in range(size ** 3) if givens.get(divmod(i // size, size), i % size) == i % size])
+        return keep, (np.arange(0, 4 * len(keep) + 1, 4), col_idx.reshape(-1, 4)[keep].ravel())
 
     def test_backtracking_generator(self):
         """Test du générateur de Sudoku utilisant l'algorithme de Backtracking."""
@@ -75,9 +78,9 @@ class TestColorSudoku(unittest.TestCase):
             self.assertTrue(self.is_valid_sudoku(grid, size), f"Backtracking algorithm with size {size} generated an invalid Sudoku grid.")
 
             # Vérifie si toutes les cellules sont colorées (aucune cellule vide)
-            for row in grid:
-                for cell in row:
-                    self.assertIsNotNone(cell, f"Cell {row, grid.index(row)} is uncolored in Backtracking algorithm with size {size}.")
+            for r, row in enumerate(grid):
+                for c, cell in enumerate(row):
+                    self.assertIsNotNone(cell, f"Cell {r, c} is uncolored in Backtracking algorithm with size {size}.")
 
     def test_mrv_generator(self):
         """Test du générateur de Sudoku utilisant l'algorithme MRV (Minimum Remaining Values)."""
@@ -88,9 +91,9 @@ class TestColorSudoku(unittest.TestCase):
             self.assertTrue(self.is_valid_sudoku(grid, size), f"MRV algorithm with size {size} generated an invalid Sudoku grid.")
 
             # Vérifie que chaque cellule est colorée
-            for row in grid:
-                for cell in row:
-                    self.assertIsNotNone(cell, f"Cell {row, grid.index(row)} is uncolored in MRV algorithm with size {size}.")
+            for r, row in enumerate(grid):
+                for c, cell in enumerate(row):
+                    self.assertIsNotNone(cell, f"Cell {r, c} is uncolored in MRV algorithm with size {size}.")
 
     def test_dsatur_generator(self):
         """Test du générateur de Sudoku utilisant l'algorithme DSATUR (Degree of Saturation)."""
@@ -101,9 +104,12 @@ class TestColorSudoku(unittest.TestCase):
             self.assertTrue(self.is_valid_sudoku(grid, size), f"DSATUR algorithm with size {size} generated an invalid Sudoku grid.")
 
             # Vérifie que chaque cellule est colorée
-            for row in grid:
-                for cell in row:
-                    self.assertIsNotNone(cell, f"Cell {row, grid.index(row)} is uncolored in DSATUR algorithm with size {size}.")
+            for r, row in enumerate(grid):
+                for c, cell in enumerate(row):
+                    self.assertIsNotNone(cell, f"Cell {r, c} is uncolored in DSATUR algorithm with size {size}.")
+
+        # Sans retour arrière, DSATUR échoue en 16x16 : une case arrive à saturation et la génération s'arrête aussitôt
+        self.assertIsNone(DSATURGenerator(size=16, colors=self.generate_colors(16)).generate_sudoku(), "DSATUR algorithm with size 16 should fail without backtracking.")
 
     def test_knuth_generator(self):
         """Test du générateur de Sudoku utilisant l'algorithme de Knuth (DLX - Dancing Links)."""
@@ -114,9 +120,50 @@ class TestColorSudoku(unittest.TestCase):
             self.assertTrue(self.is_valid_sudoku(grid, size), f"KNUTH algorithm with size {size} generated an invalid Sudoku grid.")
 
             # Vérifie que chaque cellule est colorée
-            for row in grid:
-                for cell in row:
-                    self.assertIsNotNone(cell, f"Cell {row, grid.index(row)} is uncolored in KNUTH algorithm with size {size}.")
+            for r, row in enumerate(grid):
+                for c, cell in enumerate(row):
+                    self.assertIsNotNone(cell, f"Cell {r, c} is uncolored in KNUTH algorithm with size {size}.")
+
+    def test_knuth_constrained_puzzle(self):
+        """Test de DLX sur une grille difficile avec des cases données (la recherche doit revenir sur ses pas)."""
+        puzzle = "800000000003600000070090200050007000000045700000100030001000068008500010090000400"
+        givens = {divmod(i, 9): int(digit) - 1 for i, digit in enumerate(puzzle) if digit != "0"}
+        keep, matrix = self.exact_cover_with_givens(9, givens)
+        dlx = DLX(matrix, 4 * 9 * 9)
+        self.assertTrue(dlx.search(), "DLX found no solution for a solvable puzzle.")
+
+        grid = np.zeros((9, 9), dtype=np.int8)
+        for entry in keep[dlx.solution]:
+            grid[divmod(entry // 9, 9)] = entry % 9 + 1
+        self.assertTrue(is_valid_grid(grid), "DLX solved a constrained puzzle into an invalid grid.")
+        for (r, c), color in givens.items():
+            self.assertEqual(grid[r, c], color + 1, f"Given cell {r, c} was changed by DLX.")
+
+    def test_knuth_unsatisfiable(self):
+        """Test de DLX sur une grille impossible : deux cases de la même ligne avec la même couleur."""
+        _, matrix = self.exact_cover_with_givens(9, {(0, 0): 0, (0, 1): 0})
+        dlx = DLX(matrix, 4 * 9 * 9)
+        links = [array.copy() for array in (dlx.up, dlx.down, dlx.left, dlx.right, dlx.size)]
+        self.assertFalse(dlx.search(), "DLX found a solution for an unsatisfiable puzzle.")
+
+        # Toutes les colonnes couvertes pendant la recherche doivent avoir été découvertes
+        for before, after in zip(links, (dlx.up, dlx.down, dlx.left, dlx.right, dlx.size)):
+            np.testing.assert_array_equal(before, after, "DLX links were not restored after a failed search.")
+
+    def test_color_sudoku(self):
+        """Test de la grille de jeu (indices de couleurs et masques de bits)."""
+        for size in [4, 9]:
+            game = ColorSudoku(size=size, algorithm="Knuth")
+            self.assertFalse(game.is_valid_solution(), f"Puzzle with size {size} should not be a valid solution.")
+
+            # La couleur de la solution doit être un placement valide pour chaque case vide
+            for r in range(size):
+                for c in range(size):
+                    if game.state[r][c] == 0:
+                        self.assertTrue(game.is_valid_placement(r, c, game.solution[r][c]), f"Solution color rejected at {r, c} with size {size}.")
+
+            game.reveal_solution()
+            self.assertTrue(game.is_valid_solution(), f"Revealed solution with size {size} is not valid.")
 
 # Permet d'exécuter les tests lorsque ce fichier est exécuté en tant que script.
 if __name__ == "__main__":